@@ -9,13 +9,31 @@ designed to test any government policy or guidelines — swap in different perso
 and example policies for other domains.
 """
 
-import json
+import asyncio
+import contextlib
+import functools
+import gzip
+import hashlib
+import itertools
+import logging
 import os
-import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Annotated, Final
 
-import requests
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+import msgspec
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
 
 # ============================================================
 # PERSONAS - Lived experience scenarios for policy testing
@@ -260,19 +278,138 @@ OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
 DEFAULT_MODEL = os.environ.get("OLLAMA_MODEL", "llama3")
 MAX_RESPONSE_BYTES = 512_000  # 500 KB — reject abnormally large LLM responses
 
+# Concurrent requests testing the same policy with the same model are batched
+# so each persona is analysed once. The batcher waits at most this long for
+# others to join.
+COALESCE_WINDOW_SECONDS = 0.010
+COALESCE_MAX_BATCH = 8
+
+# How long /api/status reuses its last Ollama probe, in seconds. Failures are
+# cached briefly so the UI notices quickly when Ollama comes back.
+STATUS_TTL_CONNECTED = 10.0
+STATUS_TTL_DISCONNECTED = 2.0
+
+# Number of recent policy test results kept for identical repeat requests
+RESULT_CACHE_SIZE = 128
+
+# After this many consecutive policy test batches fail because Ollama is down,
+# fail fast for the cooldown period instead of letting every request wait on a
+# dead connection. A whole batch counts once, however many personas it had.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 10.0
+
+
+class OllamaError(Exception):
+    """Base for failures talking to Ollama, so callers needn't import httpx."""
+
+
+class OllamaConnectError(OllamaError):
+    pass
+
+
+class OllamaTimeoutError(OllamaError):
+    pass
+
+
+class OllamaStatusError(OllamaError):
+    def __init__(self, status_code: int):
+        super().__init__(f"Ollama returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+# get_client() and ollama_request() are the only code that touches httpx. It is
+# imported there, on first use, to keep it out of the module's import cost.
+
+@functools.cache
+def get_client() -> "httpx.AsyncClient":
+    """Return the pooled client shared by every request.
+
+    Concurrent policy tests reuse keep-alive connections to Ollama instead of
+    opening a new one each time.
+    """
+    import httpx
+
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(300.0, connect=10.0),  # LLMs can be slow
+        limits=httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0),
+    )
+
+
+@asynccontextmanager
+async def ollama_request(method: str, path: str, **kwargs) -> AsyncIterator["httpx.Response"]:
+    """Stream a request to Ollama, raising OllamaError subclasses on failure."""
+    import httpx
+
+    try:
+        async with get_client().stream(method, f"{OLLAMA_URL}{path}", **kwargs) as response:
+            if response.is_error:
+                raise OllamaStatusError(response.status_code)
+            yield response
+    except httpx.TimeoutException as e:
+        raise OllamaTimeoutError("Ollama request timed out") from e
+    except httpx.TransportError as e:
+        raise OllamaConnectError("Cannot connect to Ollama. Is it running?") from e
+
+
 # ============================================================
 # FASTAPI APP
 # ============================================================
 
-app = FastAPI(title="Policy Tester API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the default model before serving so the first policy test doesn't
+    # pay the model load time. An empty prompt just loads it; keep_alive=-1
+    # keeps it resident. Startup carries on if Ollama isn't up yet.
+    try:
+        async with ollama_request(
+            "POST", "/api/generate", json={"model": DEFAULT_MODEL, "prompt": "", "keep_alive": -1}
+        ) as response:
+            await response.aread()
+    except OllamaError:
+        pass
+
+    # The queue is created here so it belongs to the loop the app is served on
+    global _pending_tests, _coalesce_task
+    _pending_tests = asyncio.Queue()
+    _coalesce_task = asyncio.create_task(coalesce_worker(_pending_tests))
+    _coalesce_task.add_done_callback(log_worker_exit)
+    yield
+    _coalesce_task.cancel()
+    # A crash has already been logged by log_worker_exit
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await _coalesce_task
+    _coalesce_task = None
+    _pending_tests = None
+    await get_client().aclose()
+    get_client.cache_clear()
+
+
+app = FastAPI(title="Policy Tester API", lifespan=lifespan)
+# Persona and result JSON is long prose, so it compresses well
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 # ---- Request / Response models ----
 
+PERSONA_KEYS = frozenset(PERSONAS)
+
+
+def check_categories(categories: list[str]) -> list[str]:
+    invalid = set(categories) - PERSONA_KEYS
+    if invalid:
+        raise ValueError(f"Invalid categories: {sorted(invalid)}")
+    return categories
+
+
 class TestPolicyRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     policy_text: str = Field(..., min_length=1, max_length=50_000)
-    categories: list[str] = Field(..., min_length=1)
+    categories: Annotated[list[str], AfterValidator(check_categories)] = Field(..., min_length=1)
     model: str | None = Field(default=None, max_length=200)
+    cache: bool = True  # False bypasses the result cache: no lookup and no store
 
 
 class StatusResponse(BaseModel):
@@ -281,61 +418,164 @@ class StatusResponse(BaseModel):
     default_model: str
 
 
-# ---- Helper functions ----
+class PolicyResult(msgspec.Struct):
+    """One finding from the model, encoded straight to JSON bytes by msgspec."""
+
+    # Model output isn't a schema we control; parse_results maps missing and
+    # null fields to "" so the frontend can always treat them as strings
+    persona: str = ""
+    category: str = ""
+    status: str = ""
+    issue: str = ""
+    explanation: str = ""
+    recommendation: str = ""
 
-def build_prompt(policy_text: str, categories: list[str]) -> tuple[str, str]:
-    """Build the system and user prompts for the Ollama call."""
 
-    selected_personas = [PERSONAS[cat] for cat in categories if cat in PERSONAS]
-    if not selected_personas:
-        raise ValueError("No valid categories selected")
+# ---- Helper functions ----
 
-    personas_text = "\n\n---\n\n".join(
+SYSTEM_PROMPT: Final[str] = (
+    "You are a policy analyst testing draft government policies and guidelines "
+    "against lived experience scenarios from people who will be affected by them.\n\n"
+    "Your role is to identify:\n"
+    "- CONFLICTS: Where policy requirements create impossible situations or clash with real-world constraints\n"
+    "- GAPS: What the policy doesn't address but needs to\n"
+    "- UNINTENDED_CONSEQUENCES: How the policy might create barriers or cause harm to the people affected\n"
+    "- STRENGTHS: Where the policy aligns well with needs and fair process\n\n"
+    "Be specific, cite the persona scenarios, and provide actionable recommendations.\n"
+    "You MUST respond with ONLY valid JSON, no other text."
+)
+
+# Each persona's section of the user prompt never changes, so build it once.
+PERSONA_PROMPT_FRAGMENT = {
+    cat: (
         f"{p['name']} - {p['category']}:\n{p['scenario']}\n\n"
         f"Key challenges:\n" + "\n".join(f"- {c}" for c in p["challenges"])
-        for p in selected_personas
     )
+    for cat, p in PERSONAS.items()
+}
 
-    system_prompt = (
-        "You are a policy analyst testing draft government policies and guidelines "
-        "against lived experience scenarios from people who will be affected by them.\n\n"
-        "Your role is to identify:\n"
-        "- CONFLICTS: Where policy requirements create impossible situations or clash with real-world constraints\n"
-        "- GAPS: What the policy doesn't address but needs to\n"
-        "- UNINTENDED_CONSEQUENCES: How the policy might create barriers or cause harm to the people affected\n"
-        "- STRENGTHS: Where the policy aligns well with needs and fair process\n\n"
-        "Be specific, cite the persona scenarios, and provide actionable recommendations.\n"
-        "You MUST respond with ONLY valid JSON, no other text."
-    )
 
-    user_prompt = (
-        f"Policy to test:\n{policy_text}\n\n"
-        f"Test this policy against these lived experience scenarios:\n\n{personas_text}\n\n"
-        "Analyze how this policy would impact each person. "
-        "For each persona, identify any conflicts, gaps, unintended consequences, or strengths.\n\n"
-        'Respond with ONLY this JSON format, no other text:\n'
-        '{\n'
-        '  "results": [\n'
-        '    {\n'
-        '      "persona": "persona name",\n'
-        '      "category": "category name",\n'
-        '      "status": "CONFLICT" | "GAP" | "UNINTENDED_CONSEQUENCE" | "STRENGTH",\n'
-        '      "issue": "brief one-line issue description",\n'
-        '      "explanation": "detailed explanation of the problem or strength",\n'
-        '      "recommendation": "specific actionable recommendation for policy revision"\n'
-        '    }\n'
-        '  ]\n'
-        '}'
-    )
+# Static pieces of the user prompt; only the policy and persona vary
+USER_PROMPT_HEAD: Final[str] = "Policy to test:\n"
+USER_PROMPT_MID: Final[str] = "\n\nTest this policy against this lived experience scenario:\n\n"
+USER_PROMPT_TAIL: Final[str] = (
+    "\n\n"
+    "Analyze how this policy would impact this person. "
+    "Identify any conflicts, gaps, unintended consequences, or strengths.\n\n"
+    'Respond with ONLY this JSON format, no other text:\n'
+    '{\n'
+    '  "results": [\n'
+    '    {\n'
+    '      "persona": "persona name",\n'
+    '      "category": "category name",\n'
+    '      "status": "CONFLICT" | "GAP" | "UNINTENDED_CONSEQUENCE" | "STRENGTH",\n'
+    '      "issue": "brief one-line issue description",\n'
+    '      "explanation": "detailed explanation of the problem or strength",\n'
+    '      "recommendation": "specific actionable recommendation for policy revision"\n'
+    '    }\n'
+    '  ]\n'
+    '}'
+)
+
+
+@functools.lru_cache(maxsize=256)
+def build_single_prompt(policy_text: str, category: str) -> tuple[str, str]:
+    """Build the system and user prompts for testing the policy against one persona.
+
+    Cached, since users often re-run the same policy and personas while editing.
+    """
+
+    # Categories are checked against PERSONA_KEYS when the request is validated
+    user_prompt = "".join((
+        USER_PROMPT_HEAD,
+        policy_text,
+        USER_PROMPT_MID,
+        PERSONA_PROMPT_FRAGMENT[category],
+        USER_PROMPT_TAIL,
+    ))
+
+    return SYSTEM_PROMPT, user_prompt
+
+
+class OllamaUnavailableError(OllamaError):
+    """Raised without contacting Ollama while the circuit breaker is open."""
+
+
+_breaker = {"fails": 0, "open_until": 0.0}
+
+
+def check_breaker() -> None:
+    if time.monotonic() < _breaker["open_until"]:
+        raise OllamaUnavailableError("Ollama unavailable")
+
+
+def record_ollama_result(ok: bool) -> None:
+    if ok:
+        _breaker["fails"] = 0
+        _breaker["open_until"] = 0.0
+        return
+    _breaker["fails"] += 1
+    if _breaker["fails"] >= BREAKER_FAILURE_THRESHOLD:
+        _breaker["open_until"] = time.monotonic() + BREAKER_COOLDOWN_SECONDS
 
-    return system_prompt, user_prompt
 
+def extract_json_object(content: str) -> str:
+    """Return the first balanced {...} block in content, ignoring braces in strings."""
 
-def call_ollama(system_prompt: str, user_prompt: str, model: str) -> list[dict]:
+    start = content.find("{")
+    if start == -1:
+        raise ValueError(f"Could not parse JSON from model response: {content[:200]}")
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(content)):
+        ch = content[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return content[start:i + 1]
+
+    raise ValueError(f"Could not parse JSON from model response: {content[:200]}")
+
+
+def parse_results(raw: object) -> list[PolicyResult]:
+    """Convert the model's results list, dropping items that don't fit PolicyResult."""
+
+    if not isinstance(raw, list):
+        raise ValueError(f"Model response 'results' is not a list: {str(raw)[:200]}")
+
+    results = []
+    for item in raw:
+        if isinstance(item, dict):
+            item = {k: "" if v is None else v for k, v in item.items()}
+        try:
+            results.append(msgspec.convert(item, PolicyResult, strict=False))
+        except msgspec.ValidationError as e:
+            logger.warning("Dropping malformed result from model (%s): %.200r", e, item)
+    return results
+
+
+async def call_ollama(system_prompt: str, user_prompt: str, model: str) -> list[PolicyResult]:
     """Send prompts to Ollama and parse the JSON response."""
 
-    response = requests.post(
-        f"{OLLAMA_URL}/api/chat",
+    # Read the body in chunks so an oversized response is abandoned as soon as
+    # it crosses the limit instead of being buffered in full first.
+    body = bytearray()
+    async with ollama_request(
+        "POST",
+        "/api/chat",
         json={
             "model": model,
             "messages": [
@@ -345,80 +585,292 @@ def call_ollama(system_prompt: str, user_prompt: str, model: str) -> list[dict]:
             "stream": False,
             "format": "json",
         },
-        timeout=300,  # LLMs can be slow
-    )
-    response.raise_for_status()
-
-    if len(response.content) > MAX_RESPONSE_BYTES:
-        raise ValueError("Ollama response exceeded size limit")
+    ) as response:
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > MAX_RESPONSE_BYTES:
+                raise ValueError("Ollama response exceeded size limit")
 
-    data = response.json()
+    data = orjson.loads(body)
     content = data.get("message", {}).get("content", "")
 
-    # Parse JSON from response (model might wrap it in extra text)
-    json_match = re.search(r"\{[\s\S]*\}", content)
-    if not json_match:
-        raise ValueError(f"Could not parse JSON from model response: {content[:200]}")
+    # With format=json the content should be the JSON itself; only scan for an
+    # embedded object if the model wrapped it in extra text anyway.
+    try:
+        parsed = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        parsed = None
+    if not isinstance(parsed, dict):
+        parsed = orjson.loads(extract_json_object(content))
+    return parse_results(parsed.get("results", []))
+
+
+# ---- Request coalescing ----
+
+@dataclass
+class PendingTest:
+    key: tuple[str, str]  # (model, sha256 of policy text)
+    policy_text: str
+    categories: tuple[str, ...]
+    future: asyncio.Future
+
+
+class WorkerNotRunningError(RuntimeError):
+    """Raised instead of queueing a test that coalesce_worker would never pick up."""
+
+
+# Both are created and cleared by lifespan
+_pending_tests: asyncio.Queue[PendingTest] | None = None
+_coalesce_task: asyncio.Task | None = None
+_running_batches: set[asyncio.Task] = set()
+
+
+async def run_policy_test(
+    policy_text: str, categories: tuple[str, ...], model: str
+) -> tuple[list[PolicyResult], list[str]]:
+    """Queue a policy test and wait for the (possibly shared) Ollama calls to finish.
+
+    Returns the results and the categories whose persona couldn't be analysed.
+    """
+    if _pending_tests is None or _coalesce_task is None or _coalesce_task.done():
+        raise WorkerNotRunningError("Policy test worker is not running")
+
+    key = (model, hashlib.sha256(policy_text.encode()).hexdigest())
+    future = asyncio.get_running_loop().create_future()
+    await _pending_tests.put(PendingTest(key, policy_text, categories, future))
+    return await future
+
+
+def log_worker_exit(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Policy test worker stopped", exc_info=task.exception())
+
+
+async def coalesce_worker(queue: asyncio.Queue[PendingTest]) -> None:
+    """Collect queued tests for a short window and dispatch one batch per policy."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + COALESCE_WINDOW_SECONDS
+        while len(batch) < COALESCE_MAX_BATCH:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except TimeoutError:
+                break
+
+        groups: dict[tuple[str, str], list[PendingTest]] = {}
+        for pending in batch:
+            groups.setdefault(pending.key, []).append(pending)
+
+        for group in groups.values():
+            task = asyncio.create_task(run_coalesced(group))
+            _running_batches.add(task)
+            task.add_done_callback(_running_batches.discard)
+
+
+def is_ollama_outage(error: BaseException) -> bool:
+    if isinstance(error, OllamaStatusError):
+        return error.status_code >= 500
+    return isinstance(error, (OllamaConnectError, OllamaTimeoutError))
+
 
-    parsed = json.loads(json_match.group())
-    return parsed.get("results", [])
+def fail_group(group: list[PendingTest], error: BaseException) -> None:
+    for pending in group:
+        if not pending.future.done():
+            pending.future.set_exception(error)
+
+
+async def run_coalesced(group: list[PendingTest]) -> None:
+    """Test each persona in the group once, concurrently, and fan the results out.
+
+    One short prompt per persona, rather than one long prompt for all of them,
+    keeps prefill cheap and lets Ollama schedule the calls alongside others.
+    """
+    model, _ = group[0].key
+    policy_text = group[0].policy_text
+    categories = sorted({c for pending in group for c in pending.categories})
+
+    try:
+        check_breaker()
+    except OllamaUnavailableError as e:
+        fail_group(group, e)
+        return
+
+    async def test_persona(category: str) -> list[PolicyResult] | ValueError:
+        try:
+            return await call_ollama(*build_single_prompt(policy_text, category), model)
+        except ValueError as e:
+            # A bad answer for one persona shouldn't throw away the others
+            logger.warning("Persona %s failed: %s", category, e)
+            return e
+
+    # Anything other than a bad model answer (Ollama down, timed out, erroring)
+    # will fail the remaining personas too, so let the TaskGroup cancel them.
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = {cat: tg.create_task(test_persona(cat)) for cat in categories}
+    except ExceptionGroup as eg:
+        error = eg.exceptions[0]
+        record_ollama_result(not is_ollama_outage(error))
+        fail_group(group, error)
+        return
+
+    record_ollama_result(True)
+    outcomes = {cat: task.result() for cat, task in tasks.items()}
+    for pending in group:
+        if pending.future.done():
+            continue  # client went away
+        failed = [c for c in pending.categories if isinstance(outcomes[c], ValueError)]
+        if len(failed) == len(pending.categories):
+            pending.future.set_exception(outcomes[failed[0]])
+            continue
+        pending.future.set_result((
+            list(itertools.chain.from_iterable(
+                outcomes[c] for c in pending.categories if c not in failed
+            )),
+            failed,
+        ))
+
+
+# ---- Result cache ----
+
+# Inference dominates request time, so identical repeat requests are answered
+# from the most recent RESULT_CACHE_SIZE results (least recently used first out).
+_result_cache: OrderedDict[str, list[PolicyResult]] = OrderedDict()
+
+
+def result_cache_key(model: str, policy_text: str, categories: tuple[str, ...]) -> str:
+    raw = f"{model}|{policy_text}|{','.join(categories)}".encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def results_response(results: list[PolicyResult], failed: list[str]) -> Response:
+    """Encode the findings plus the categories whose persona couldn't be analysed."""
+    return Response(
+        msgspec.json.encode({"results": results, "failed": failed}), media_type="application/json"
+    )
 
 
 # ---- API endpoints ----
 
+# (checked_at, status) from the last Ollama probe, see STATUS_TTL_*
+_status_cache: tuple[float, StatusResponse] | None = None
+
+
 @app.get("/api/status")
-def get_status() -> StatusResponse:
+async def get_status() -> StatusResponse:
     """Check Ollama connection and list available models."""
+    global _status_cache
+
+    now = time.monotonic()
+    if _status_cache is not None:
+        checked_at, cached = _status_cache
+        ttl = STATUS_TTL_CONNECTED if cached.connected else STATUS_TTL_DISCONNECTED
+        if now - checked_at < ttl:
+            return cached
+
     try:
-        resp = requests.get(f"{OLLAMA_URL}/api/tags", timeout=5)
-        resp.raise_for_status()
-        models = [m["name"] for m in resp.json().get("models", [])]
-        return StatusResponse(
+        async with ollama_request("GET", "/api/tags", timeout=5) as resp:
+            await resp.aread()
+        models = [m["name"] for m in orjson.loads(resp.content).get("models", [])]
+        record_ollama_result(True)  # Ollama is back, so close the breaker early
+        status = StatusResponse(
             connected=True,
             models=models,
             default_model=models[0] if models else DEFAULT_MODEL,
         )
     except Exception:
-        return StatusResponse(connected=False, models=[], default_model=DEFAULT_MODEL)
+        status = StatusResponse(connected=False, models=[], default_model=DEFAULT_MODEL)
+
+    _status_cache = (now, status)
+    return status
+
+
+# Personas and example policies never change while the server runs, so serve
+# pre-serialized (and pre-compressed) bytes rather than re-encoding the dicts on
+# every request. GZipMiddleware passes responses that already have a
+# Content-Encoding through untouched.
+PERSONAS_JSON = orjson.dumps(PERSONAS)
+PERSONAS_JSON_GZIP = gzip.compress(PERSONAS_JSON, mtime=0)
+EXAMPLE_POLICIES_JSON = orjson.dumps(EXAMPLE_POLICIES)
+EXAMPLE_POLICIES_JSON_GZIP = gzip.compress(EXAMPLE_POLICIES_JSON, mtime=0)
+
+
+def static_json_response(request: Request, body: bytes, gzipped: bytes) -> Response:
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            gzipped,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(body, media_type="application/json")
 
 
 @app.get("/api/personas")
-def get_personas() -> dict:
+def get_personas(request: Request) -> Response:
     """Return all personas so the frontend can display them."""
-    return PERSONAS
+    return static_json_response(request, PERSONAS_JSON, PERSONAS_JSON_GZIP)
 
 
 @app.get("/api/example-policies")
-def get_example_policies() -> dict:
+def get_example_policies(request: Request) -> Response:
     """Return all example policies."""
-    return EXAMPLE_POLICIES
+    return static_json_response(request, EXAMPLE_POLICIES_JSON, EXAMPLE_POLICIES_JSON_GZIP)
 
 
 @app.post("/api/test-policy")
-def test_policy(request: TestPolicyRequest) -> dict:
+async def test_policy(request: TestPolicyRequest) -> Response:
     """Test a policy against selected personas using Ollama."""
 
-    if not request.policy_text.strip():
-        raise HTTPException(status_code=400, detail="Policy text is required")
-
-    if not request.categories:
-        raise HTTPException(status_code=400, detail="At least one category is required")
-
-    invalid = [c for c in request.categories if c not in PERSONAS]
-    if invalid:
-        raise HTTPException(status_code=400, detail=f"Invalid categories: {invalid}")
-
     model = request.model or DEFAULT_MODEL
+    categories = tuple(request.categories)
+
+    # Keyed on the caller's category order, which is the order results come back in
+    key = result_cache_key(model, request.policy_text, categories)
+    if request.cache and key in _result_cache:
+        _result_cache.move_to_end(key)
+        return results_response(_result_cache[key], [])
 
     try:
-        system_prompt, user_prompt = build_prompt(request.policy_text, request.categories)
-        results = call_ollama(system_prompt, user_prompt, model)
-        return {"results": results}
-    except requests.ConnectionError:
-        raise HTTPException(status_code=502, detail="Cannot connect to Ollama. Is it running?")
-    except requests.Timeout:
-        raise HTTPException(status_code=504, detail="Ollama request timed out")
-    except (ValueError, json.JSONDecodeError) as e:
+        results, failed = await run_policy_test(request.policy_text, categories, model)
+    except OllamaTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except (OllamaConnectError, OllamaStatusError) as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except WorkerNotRunningError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except OllamaUnavailableError:
+        raise HTTPException(
+            status_code=503, detail="Ollama is unavailable after repeated failures. Try again shortly."
+        )
+    except (ValueError, orjson.JSONDecodeError) as e:
         raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {e}")
+
+    # Partial results are not cached, so a retry gets another go at the failed personas
+    if request.cache and not failed:
+        _result_cache[key] = results
+        _result_cache.move_to_end(key)
+        if len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return results_response(results, failed)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Request coalescing, the result and status caches and the circuit breaker
+    # are per process, so extra workers (WEB_CONCURRENCY) don't share them.
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard]),
+    # falling back to asyncio/h11 on platforms without them.
+    uvicorn.run(
+        "server.app:app",
+        port=8000,
+        workers=int(os.environ.get("WEB_CONCURRENCY", "1")),
+        loop="auto",
+        http="auto",
+    )
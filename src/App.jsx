@@ -34,7 +34,9 @@ async function testPolicyApi(policyText, categories, model) {
   });
   if (!res.ok) {
     const err = await res.json().catch(() => ({ detail: 'Request failed' }));
-    throw new Error(err.detail || 'Request failed');
+    // Validation errors (422) come back as a list of { msg } objects
+    const detail = Array.isArray(err.detail) ? err.detail.map((d) => d.msg).join('; ') : err.detail;
+    throw new Error(detail || 'Request failed');
   }
   return res.json();
 }
@@ -52,6 +54,7 @@ function App() {
   const [policyText, setPolicyText] = useState('');
   const [selectedCategories, setSelectedCategories] = useState([]);
   const [results, setResults] = useState(null);
+  const [failedCategories, setFailedCategories] = useState([]);
   const [loading, setLoading] = useState(false);
   const [expandedResults, setExpandedResults] = useState({});
 
@@ -136,10 +139,12 @@ function App() {
 
     setLoading(true);
     setResults(null);
+    setFailedCategories([]);
 
     try {
       const data = await testPolicyApi(policyText, selectedCategories, ollamaModel);
       setResults(data.results || []);
+      setFailedCategories(data.failed || []);
     } catch (error) {
       console.error('Error:', error);
       alert('Error testing policy: ' + error.message);
@@ -398,6 +403,20 @@ function App() {
                   </div>
                 </div>
 
+                {/* Personas the model couldn't analyse */}
+                {failedCategories.length > 0 && (
+                  <div className="flex items-start gap-2 bg-amber-50 border border-amber-200 rounded-lg p-4 mb-6 text-sm text-amber-800">
+                    <AlertTriangle className="w-5 h-5 text-amber-500 flex-shrink-0" />
+                    <p>
+                      Could not analyse:{' '}
+                      {failedCategories
+                        .map((cat) => (personas[cat] ? `${personas[cat].name} (${personas[cat].category})` : cat))
+                        .join(', ')}.
+                      Run the test again to retry these personas.
+                    </p>
+                  </div>
+                )}
+
                 {/* Result Cards */}
                 <div className="space-y-3">
                   {results.map((result, index) => (